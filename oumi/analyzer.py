@@ -3,10 +3,17 @@
 Oumi Analyzer - Analyzes code and formats as GitHub issues
 """
 
+import asyncio
+import hashlib
 import os
 import re
 import ast
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Sequence
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -47,16 +54,246 @@ except ImportError as e:
     import logging
     logging.warning(f"Oumi not available: {e}. API endpoints will fail.")
 
+# Extension -> display language, built once at import time.
+_EXT_MAP = {
+    '.js': 'JavaScript', '.jsx': 'JavaScript (React)', '.ts': 'TypeScript', '.tsx': 'TypeScript (React)',
+    '.py': 'Python', '.pyw': 'Python',
+    '.java': 'Java', '.kt': 'Kotlin', '.scala': 'Scala',
+    '.go': 'Go', '.rs': 'Rust', '.c': 'C', '.cpp': 'C++', '.cc': 'C++', '.cxx': 'C++', '.h': 'C/C++ Header',
+    '.cs': 'C#', '.vb': 'Visual Basic', '.fs': 'F#',
+    '.rb': 'Ruby', '.php': 'PHP', '.swift': 'Swift', '.m': 'Objective-C',
+    '.dart': 'Dart', '.lua': 'Lua', '.perl': 'Perl', '.pl': 'Perl',
+    '.sh': 'Shell', '.bash': 'Bash', '.zsh': 'Zsh',
+    '.sol': 'Solidity', '.vy': 'Vyper',
+    '.html': 'HTML', '.htm': 'HTML', '.xml': 'XML', '.css': 'CSS', '.scss': 'SCSS', '.sass': 'Sass', '.less': 'Less',
+    '.json': 'JSON', '.yaml': 'YAML', '.yml': 'YAML', '.toml': 'TOML', '.ini': 'INI', '.conf': 'Config',
+    '.sql': 'SQL', '.graphql': 'GraphQL', '.gql': 'GraphQL',
+    '.md': 'Markdown', '.rst': 'reStructuredText', '.tex': 'LaTeX',
+    '.r': 'R', '.jl': 'Julia', '.ex': 'Elixir', '.exs': 'Elixir', '.erl': 'Erlang',
+    '.clj': 'Clojure', '.hs': 'Haskell', '.ml': 'OCaml',
+    '.dockerfile': 'Dockerfile', '.proto': 'Protocol Buffer',
+    '.vue': 'Vue', '.svelte': 'Svelte'
+}
+
+
+# Analysis prompt, built once; only the per-file fields get formatted in.
+_PROMPT_TEMPLATE = """You are analyzing {lang} code for: {types}
+
+```{ext}
+{body}
+```
+
+CHECK EVERY LINE for these issues:
+- Syntax errors: missing ), }}, ], ;, quotes, typos (strin→string)
+- Division by zero: X/0
+- SQL injection: "SELECT" + user_input
+- Null access: value.property without null check
+- Security: eval(), os.system(), hardcoded secrets
+- Logic: if (x = 5) instead of ==, count && <Component/> shows 0
+
+Report ALL problems found:
+### Issues
+- Line X: [problem description]
+
+If NO problems: "No issues detected."{user_context}"""
+
+_MAX_PROMPT_CONTENT = 80000
+
+# Hot-path regexes and keyword scans, compiled once at import time.
+_LINE_RE = re.compile(r'[-*]\s*Line\s+(\d+):\s*(.+)')
+_LINE_PREFIXES = ('- Line ', '* Line ')
+_SECTION_RE = re.compile(r'\n###?\s+')
+
+_PRIORITY_KEYWORDS = {
+    'critical': ['critical', 'security vulnerability', 'sql injection', 'xss', 'csrf', 'authentication bypass', 'data breach', 'exposed secret', 'hardcoded password'],
+    'high': ['syntax error', 'compilation error', 'runtime error', 'undefined variable', 'null pointer', 'exception', 'crash', 'bug', 'error', 'typeerror', 'nameerror', 'attributeerror'],
+    'medium': ['warning', 'deprecated', 'performance issue', 'memory leak', 'infinite loop'],
+    'low': ['suggestion', 'improvement', 'best practice', 'style', 'formatting']
+}
+# Single merged scan: one pass over the text instead of one per level.
+_PRIORITY_RX = re.compile(
+    '|'.join(
+        "(?P<{}>{})".format(level, '|'.join(map(re.escape, keywords)))
+        for level, keywords in _PRIORITY_KEYWORDS.items()
+    ),
+    re.IGNORECASE
+)
+_PRIORITY_RANK = {level: rank for rank, level in enumerate(_PRIORITY_KEYWORDS)}
+
+_ERROR_TAGS = {
+    'syntax': ['syntax error', 'syntaxerror', 'missing bracket', 'missing parenthesis', 'missing semicolon', 'unclosed', 'unterminated'],
+    'type-error': ['type error', 'typeerror', 'type mismatch', 'wrong type', 'undefined type'],
+    'runtime-error': ['runtime error', 'runtimeerror', 'null pointer', 'nullpointerexception', 'division by zero', 'array out of bounds'],
+    'reference-error': ['reference error', 'referenceerror', 'undefined variable', 'undefined function', 'not defined'],
+    'import-error': ['import error', 'importerror', 'module not found', 'cannot find module', 'missing import'],
+    'compilation-error': ['compilation error', 'compile error', 'build error', 'build failed'],
+    'sql-injection': ['sql injection', 'sql concatenation', 'query concatenation'],
+    'xss': ['xss', 'cross-site scripting', 'innerhtml', 'dangerouslysetinnerhtml'],
+    'command-injection': ['command injection', 'os.system', 'subprocess', 'eval', 'exec'],
+    'security': ['security vulnerability', 'security issue', 'exposed secret', 'hardcoded password', 'api key'],
+    'memory-leak': ['memory leak', 'unclosed resource', 'resource leak'],
+    'performance': ['performance issue', 'infinite loop', 'blocking operation', 'unnecessary re-render'],
+    'logic-error': ['logic error', 'incorrect condition', 'wrong operator', 'unreachable code']
+}
+_TAG_PATTERNS = {
+    tag: re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+    for tag, keywords in _ERROR_TAGS.items()
+}
+
+
+@lru_cache(maxsize=1)
+def _build_lang_map():
+    """Build the extension -> tree-sitter Language mapping once per process."""
+    return {
+        '.py': ts_python.language(),
+        '.js': ts_javascript.language(),
+        '.jsx': ts_javascript.language(),
+        '.ts': ts_typescript.language_typescript(),
+        '.tsx': ts_typescript.language_tsx(),
+        '.java': ts_java.language(),
+        '.go': ts_go.language(),
+        '.rs': ts_rust.language(),
+        '.c': ts_c.language(),
+        '.cpp': ts_cpp.language(),
+        '.cc': ts_cpp.language(),
+        '.cxx': ts_cpp.language(),
+        '.h': ts_c.language(),
+        '.hpp': ts_cpp.language(),
+        '.cs': ts_csharp.language(),
+        '.php': ts_php.language(),
+        '.rb': ts_ruby.language(),
+        '.sh': ts_bash.language(),
+        '.bash': ts_bash.language(),
+        '.html': ts_html.language(),
+        '.htm': ts_html.language(),
+        '.css': ts_css.language(),
+        '.dockerfile': ts_dockerfile.language(),
+        '.kt': ts_kotlin.language(),
+        '.kts': ts_kotlin.language(),
+        '.json': ts_json.language(),
+        '.sql': ts_sql.language()
+    }
+
+
+@dataclass(frozen=True)
+class _FileCtx:
+    """Per-file derived fields, computed once and threaded through the hot path."""
+    path: str
+    suffix: str
+    lang: str
+    lang_tag: str
+
+
+def _make_file_ctx(file_path: str) -> _FileCtx:
+    suffix = Path(file_path).suffix.lower()
+    lang = OumiAnalyzer._get_file_language(suffix)
+    return _FileCtx(
+        path=file_path,
+        suffix=suffix,
+        lang=lang,
+        lang_tag=lang.lower().split()[0]
+    )
+
+
+# Tag scanning only needs keyword hits; cap how much text gets scanned.
+_MAX_TAG_SCAN = 4096
+
+
+def _file_fields(file_data):
+    """Return (path, content) from either an attribute-style object (e.g.
+    a Pydantic FileInput) or a plain mapping."""
+    if hasattr(file_data, 'path'):
+        return file_data.path, file_data.content
+    return file_data["path"], file_data["content"]
+
+
+# Bounded LRU of raw analysis texts keyed by content hash, so repeated
+# uploads of identical content skip the LLM round trip entirely. The raw
+# text is cached (not the parsed result) because issues embed the file
+# path, which may differ between hits.
+_ANALYSIS_CACHE: OrderedDict = OrderedDict()
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+_ANALYSIS_CACHE_SIZE = 1024
+
+
+def _analysis_cache_key(content_bytes: bytes, analysis_types: List[str], user_prompt: Optional[str]) -> tuple:
+    return (
+        hashlib.sha256(content_bytes).digest(),
+        tuple(sorted(analysis_types)),
+        user_prompt
+    )
+
+
+def _analysis_cache_get(key: tuple) -> Optional[str]:
+    with _ANALYSIS_CACHE_LOCK:
+        text = _ANALYSIS_CACHE.get(key)
+        if text is not None:
+            _ANALYSIS_CACHE.move_to_end(key)
+        return text
+
+
+def _analysis_cache_put(key: tuple, text: str):
+    with _ANALYSIS_CACHE_LOCK:
+        _ANALYSIS_CACHE[key] = text
+        _ANALYSIS_CACHE.move_to_end(key)
+        while len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_SIZE:
+            _ANALYSIS_CACHE.popitem(last=False)
+
+
+# Shared pool for the local, CPU-bound preparation work. Tree-sitter's C
+# parse releases the GIL, so threads already scale across cores and a
+# process pool's spawn/pickle overhead isn't worth it.
+_CPU_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix='analyzer-cpu'
+)
+
+
+# Parsers are cached per thread: a tree-sitter Parser must never be used
+# by two threads at once, and both batch preparation and the async
+# fan-out parse many files concurrently. Construction is cheap next to
+# parsing, so one Parser per (thread, extension) is the safe trade.
+# Extensions whose construction failed (e.g. an incompatible
+# py-tree-sitter API) are remembered process-wide so the failure isn't
+# retried per file and callers degrade to the ast fallback.
+_PARSER_LOCAL = threading.local()
+_PARSER_FAILED: set = set()
+_PARSER_LOCK = threading.Lock()
+
+
+def _get_parser(ext: str):
+    """Return this thread's Tree-sitter parser for an extension, or None."""
+    if not TREE_SITTER_AVAILABLE or ext in _PARSER_FAILED:
+        return None
+    cache = getattr(_PARSER_LOCAL, 'parsers', None)
+    if cache is None:
+        cache = _PARSER_LOCAL.parsers = {}
+    parser = cache.get(ext)
+    if parser is not None:
+        return parser
+    try:
+        lang = _build_lang_map().get(ext)
+        if lang is None:
+            return None
+        parser = Parser()
+        parser.set_language(lang)
+    except Exception:
+        with _PARSER_LOCK:
+            _PARSER_FAILED.add(ext)
+        return None
+    cache[ext] = parser
+    return parser
+
+
 class OumiAnalyzer:
     def __init__(self, model_name: str = "gpt-4o-mini"):
         if model_name.startswith('openai/'):
             model_name = model_name.replace('openai/', '')
         self.model_name = model_name
         self.engine = None
-        self.parsers = {}
         self._initialize_engine()
         self._initialize_tree_sitter()
-    
+
     def _initialize_engine(self):
         if not OUMI_AVAILABLE:
             raise RuntimeError("Oumi is not available. Please install oumi package and set OPENAI_API_KEY.")
@@ -71,85 +308,42 @@ class OumiAnalyzer:
         )
     
     def _initialize_tree_sitter(self):
-        """Initialize Tree-sitter parsers for multi-language syntax checking."""
+        """Pre-warm the language map and flag unbuildable parsers (idempotent)."""
         if not TREE_SITTER_AVAILABLE:
             return
-        
+
         try:
-            lang_map = {
-                '.py': ts_python.language(),
-                '.js': ts_javascript.language(),
-                '.jsx': ts_javascript.language(),
-                '.ts': ts_typescript.language_typescript(),
-                '.tsx': ts_typescript.language_tsx(),
-                '.java': ts_java.language(),
-                '.go': ts_go.language(),
-                '.rs': ts_rust.language(),
-                '.c': ts_c.language(),
-                '.cpp': ts_cpp.language(),
-                '.cc': ts_cpp.language(),
-                '.cxx': ts_cpp.language(),
-                '.h': ts_c.language(),
-                '.hpp': ts_cpp.language(),
-                '.cs': ts_csharp.language(),
-                '.php': ts_php.language(),
-                '.rb': ts_ruby.language(),
-                '.sh': ts_bash.language(),
-                '.bash': ts_bash.language(),
-                '.html': ts_html.language(),
-                '.htm': ts_html.language(),
-                '.css': ts_css.language(),
-                '.dockerfile': ts_dockerfile.language(),
-                '.kt': ts_kotlin.language(),
-                '.kts': ts_kotlin.language(),
-                '.json': ts_json.language(),
-                '.sql': ts_sql.language()
-            }
-            
-            for ext, lang in lang_map.items():
-                parser = Parser()
-                parser.set_language(lang)
-                self.parsers[ext] = parser
-        except Exception as e:
+            for ext in _build_lang_map():
+                _get_parser(ext)
+        except Exception:
             pass
     
-    def _get_file_language(self, file_path: str) -> str:
-        """Detect language/file type from extension."""
-        ext_map = {
-            '.js': 'JavaScript', '.jsx': 'JavaScript (React)', '.ts': 'TypeScript', '.tsx': 'TypeScript (React)',
-            '.py': 'Python', '.pyw': 'Python',
-            '.java': 'Java', '.kt': 'Kotlin', '.scala': 'Scala',
-            '.go': 'Go', '.rs': 'Rust', '.c': 'C', '.cpp': 'C++', '.cc': 'C++', '.cxx': 'C++', '.h': 'C/C++ Header',
-            '.cs': 'C#', '.vb': 'Visual Basic', '.fs': 'F#',
-            '.rb': 'Ruby', '.php': 'PHP', '.swift': 'Swift', '.m': 'Objective-C',
-            '.dart': 'Dart', '.lua': 'Lua', '.perl': 'Perl', '.pl': 'Perl',
-            '.sh': 'Shell', '.bash': 'Bash', '.zsh': 'Zsh',
-            '.sol': 'Solidity', '.vy': 'Vyper',
-            '.html': 'HTML', '.htm': 'HTML', '.xml': 'XML', '.css': 'CSS', '.scss': 'SCSS', '.sass': 'Sass', '.less': 'Less',
-            '.json': 'JSON', '.yaml': 'YAML', '.yml': 'YAML', '.toml': 'TOML', '.ini': 'INI', '.conf': 'Config',
-            '.sql': 'SQL', '.graphql': 'GraphQL', '.gql': 'GraphQL',
-            '.md': 'Markdown', '.rst': 'reStructuredText', '.tex': 'LaTeX',
-            '.r': 'R', '.jl': 'Julia', '.ex': 'Elixir', '.exs': 'Elixir', '.erl': 'Erlang',
-            '.clj': 'Clojure', '.hs': 'Haskell', '.ml': 'OCaml',
-            '.dockerfile': 'Dockerfile', '.proto': 'Protocol Buffer',
-            '.vue': 'Vue', '.svelte': 'Svelte'
-        }
-        ext = Path(file_path).suffix.lower()
-        return ext_map.get(ext, 'Unknown')
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _get_file_language(suffix: str) -> str:
+        """Detect language/file type from a lowercased file suffix."""
+        return _EXT_MAP.get(suffix, 'Unknown')
     
-    def _check_syntax_errors(self, file_path: str, content: str) -> Optional[Dict[str, Any]]:
-        """Check for syntax errors using Tree-sitter (multi-language) or AST (Python fallback)."""
-        file_ext = Path(file_path).suffix.lower()
-        file_lang = self._get_file_language(file_path)
-        
+    def _check_syntax_errors(self, ctx: _FileCtx, content: str, content_bytes: Optional[bytes] = None) -> Optional[Dict[str, Any]]:
+        """Check for syntax errors using Tree-sitter (multi-language) or AST (Python fallback).
+
+        Callers that already hold the UTF-8 encoding of `content` can pass
+        it as `content_bytes` to skip a redundant encode.
+        """
+        file_path = ctx.path
+        file_ext = ctx.suffix
+        file_lang = ctx.lang
+
         # Try Tree-sitter first (supports multiple languages)
-        if TREE_SITTER_AVAILABLE and file_ext in self.parsers:
+        parser = _get_parser(file_ext)
+        if parser is not None:
             try:
-                tree = self.parsers[file_ext].parse(content.encode('utf-8'))
-                
+                encoded = content_bytes if content_bytes is not None else content.encode('utf-8')
+                tree = parser.parse(encoded)
+
                 if tree.root_node.has_error:
                     errors = []
-                    self._find_syntax_errors(tree.root_node, errors, content)
+                    self._find_syntax_errors(tree.root_node, errors, encoded)
                     
                     if errors:
                         error_msg = "\n".join([f"Line {e['line']}: {e['msg']}" for e in errors[:5]])
@@ -174,16 +368,21 @@ This code will fail to compile/run.
 ---
 *Detected by Tree-sitter + Oumi*
 """
-                        tags = ["syntax-error", file_lang.lower().split()[0], "compilation-error"]
+                        tags = ["syntax-error", ctx.lang_tag, "compilation-error"]
                         return {
                             "title": f"Syntax Error: {Path(file_path).name}",
                             "body": body,
                             "tags": tags
                         }
+                else:
+                    # Tree-sitter parsed cleanly; no need to re-parse with ast.
+                    return None
+                # has_error with no ERROR nodes (e.g. MISSING-only trees):
+                # fall through so the ast fallback can still report it.
             except Exception:
                 pass
-        
-        # Fallback to Python AST for Python files
+
+        # Fallback to Python AST only when Tree-sitter couldn't check the file
         if file_ext == '.py':
             try:
                 ast.parse(content)
@@ -224,38 +423,38 @@ This code will fail to compile/run.
         
         return None
     
-    def _find_syntax_errors(self, node, errors: List[Dict], content: str):
-        """Recursively find ERROR nodes in Tree-sitter parse tree."""
-        if node.type == 'ERROR':
-            line_num = node.start_point[0] + 1
-            line_content = content.split('\n')[node.start_point[0]] if node.start_point[0] < len(content.split('\n')) else ""
-            errors.append({
-                'line': line_num,
-                'msg': f"Syntax error in code: {line_content.strip()[:50]}"
-            })
-        
-        for child in node.children:
-            self._find_syntax_errors(child, errors, content)
+    def _find_syntax_errors(self, node, errors: List[Dict], data: bytes):
+        """Find ERROR nodes in a Tree-sitter parse tree (first 5 only).
+
+        `data` is the encoded source the tree was parsed from; each error
+        snippet is sliced out via the node's byte offsets, so no line list
+        is ever materialized.
+        """
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.type == 'ERROR':
+                snippet = data[current.start_byte:current.end_byte][:50].decode('utf-8', 'replace')
+                errors.append({
+                    'line': current.start_point[0] + 1,
+                    'msg': f"Syntax error in code: {snippet.strip()[:50]}"
+                })
+                if len(errors) >= 5:
+                    return
+            # Reversed so pop() visits children left-to-right, keeping
+            # errors in document order.
+            stack.extend(reversed(current.children))
     
     def _determine_priority(self, analysis_text: str) -> str:
         """Determine priority based on severity keywords in analysis."""
-        text_lower = analysis_text.lower()
-        
-        critical_keywords = ['critical', 'security vulnerability', 'sql injection', 'xss', 'csrf', 'authentication bypass', 'data breach', 'exposed secret', 'hardcoded password']
-        high_keywords = ['syntax error', 'compilation error', 'runtime error', 'undefined variable', 'null pointer', 'exception', 'crash', 'bug', 'error', 'typeerror', 'nameerror', 'attributeerror']
-        medium_keywords = ['warning', 'deprecated', 'performance issue', 'memory leak', 'infinite loop']
-        low_keywords = ['suggestion', 'improvement', 'best practice', 'style', 'formatting']
-        
-        if any(keyword in text_lower for keyword in critical_keywords):
-            return "critical"
-        elif any(keyword in text_lower for keyword in high_keywords):
-            return "high"
-        elif any(keyword in text_lower for keyword in medium_keywords):
-            return "medium"
-        elif any(keyword in text_lower for keyword in low_keywords):
-            return "low"
-        else:
-            return "medium"
+        best = None
+        for match in _PRIORITY_RX.finditer(analysis_text):
+            level = match.lastgroup
+            if best is None or _PRIORITY_RANK[level] < _PRIORITY_RANK[best]:
+                best = level
+                if level == 'critical':
+                    break
+        return best or "medium"
     
     def _format_as_github_issue(self, file_path: str, issue_title: str, issue_body: str, priority: str, analysis_type: str) -> Dict[str, str]:
         """Format analysis as GitHub issue payload."""
@@ -283,41 +482,46 @@ This code will fail to compile/run.
             "tags": []
         }
     
-    def _extract_tags(self, title: str, content: str, file_path: str) -> List[str]:
+    def _extract_tags(self, title: str, content: str, ctx: _FileCtx) -> List[str]:
         """Extract 1-5 relevant tags for the issue."""
         tags = []
-        text = (title + " " + content).lower()
-        file_ext = Path(file_path).suffix.lower()
-        
-        error_tags = {
-            'syntax': ['syntax error', 'syntaxerror', 'missing bracket', 'missing parenthesis', 'missing semicolon', 'unclosed', 'unterminated'],
-            'type-error': ['type error', 'typeerror', 'type mismatch', 'wrong type', 'undefined type'],
-            'runtime-error': ['runtime error', 'runtimeerror', 'null pointer', 'nullpointerexception', 'division by zero', 'array out of bounds'],
-            'reference-error': ['reference error', 'referenceerror', 'undefined variable', 'undefined function', 'not defined'],
-            'import-error': ['import error', 'importerror', 'module not found', 'cannot find module', 'missing import'],
-            'compilation-error': ['compilation error', 'compile error', 'build error', 'build failed'],
-            'sql-injection': ['sql injection', 'sql concatenation', 'query concatenation'],
-            'xss': ['xss', 'cross-site scripting', 'innerhtml', 'dangerouslysetinnerhtml'],
-            'command-injection': ['command injection', 'os.system', 'subprocess', 'eval', 'exec'],
-            'security': ['security vulnerability', 'security issue', 'exposed secret', 'hardcoded password', 'api key'],
-            'memory-leak': ['memory leak', 'unclosed resource', 'resource leak'],
-            'performance': ['performance issue', 'infinite loop', 'blocking operation', 'unnecessary re-render'],
-            'logic-error': ['logic error', 'incorrect condition', 'wrong operator', 'unreachable code']
-        }
-        
-        for tag, keywords in error_tags.items():
-            if any(keyword in text for keyword in keywords):
+        text = title + " " + (content if len(content) <= _MAX_TAG_SCAN else content[:_MAX_TAG_SCAN])
+
+        for tag, pattern in _TAG_PATTERNS.items():
+            if pattern.search(text):
                 tags.append(tag)
                 if len(tags) >= 3:
                     break
-        
-        lang_tag = self._get_file_language(file_path).lower().split()[0]
-        if lang_tag and lang_tag not in tags:
-            tags.append(lang_tag)
-        
+
+        if ctx.lang_tag and ctx.lang_tag not in tags:
+            tags.append(ctx.lang_tag)
+
         return tags[:5]
     
-    def _parse_analysis_to_issues(self, file_path: str, analysis_text: str, analysis_types: List[str]) -> List[Dict[str, str]]:
+    def _issue_from_line(self, ctx: _FileCtx, issue_line: str, priority: str, types_str: str) -> Optional[Dict[str, str]]:
+        """Turn a single '- Line N: ...' analysis line into an issue dict."""
+        issue_match = _LINE_RE.match(issue_line)
+        if not issue_match:
+            return None
+
+        line_num = issue_match.group(1)
+        issue_desc = issue_match.group(2).strip()
+
+        issue_title = f"Line {line_num}: {issue_desc[:60]}"
+        if len(issue_desc) > 60:
+            issue_title += "..."
+
+        issue = self._format_as_github_issue(
+            file_path=ctx.path,
+            issue_title=issue_title,
+            issue_body=f"**Line {line_num}:** {issue_desc}",
+            priority=priority,
+            analysis_type=types_str
+        )
+        issue["tags"] = self._extract_tags(issue_title, issue_desc, ctx)
+        return issue
+
+    def _parse_analysis_to_issues(self, ctx: _FileCtx, analysis_text: str, analysis_types: List[str]) -> List[Dict[str, str]]:
         """Parse Oumi analysis text into separate GitHub issues based on severity."""
         issues = []
         
@@ -331,36 +535,23 @@ This code will fail to compile/run.
         priority = self._determine_priority(analysis_text)
         types_str = ", ".join(analysis_types) if isinstance(analysis_types, list) else analysis_types
         
-        issue_lines = []
+        # Single pass: each "- Line N: ..." line becomes an issue as soon
+        # as it is seen, so this loop can also consume a response stream
+        # line by line once the inference engine exposes one.
         for line in analysis_text.split('\n'):
             line_stripped = line.strip()
-            if line_stripped.startswith('- Line ') or line_stripped.startswith('* Line '):
-                issue_lines.append(line_stripped)
-        
-        if issue_lines:
-            for issue_line in issue_lines:
-                issue_match = re.match(r'[-*]\s*Line\s+(\d+):\s*(.+)', issue_line)
-                if issue_match:
-                    line_num = issue_match.group(1)
-                    issue_desc = issue_match.group(2).strip()
-                    
-                    issue_title = f"Line {line_num}: {issue_desc[:60]}"
-                    if len(issue_desc) > 60:
-                        issue_title += "..."
-                    
-                    tags = self._extract_tags(issue_title, issue_desc, file_path)
-                    
-                    issue = self._format_as_github_issue(
-                        file_path=file_path,
-                        issue_title=issue_title,
-                        issue_body=f"**Line {line_num}:** {issue_desc}",
-                        priority=priority,
-                        analysis_type=types_str
-                    )
-                    issue["tags"] = tags
+            if line_stripped.startswith(_LINE_PREFIXES):
+                issue = self._issue_from_line(ctx, line_stripped, priority, types_str)
+                if issue:
                     issues.append(issue)
-        else:
-            sections = re.split(r'\n###?\s+', analysis_text)
+
+        if not issues:
+            # The prompt asks for literal '### ' headers, so a plain split
+            # covers the common case; the regex (which also accepts '## ')
+            # only runs when that finds nothing.
+            sections = analysis_text.split('\n### ')
+            if len(sections) < 2:
+                sections = _SECTION_RE.split(analysis_text)
             if len(sections) < 2:
                 sections = [analysis_text]
             
@@ -379,11 +570,11 @@ This code will fail to compile/run.
                 section_title = lines[0][:80] if lines else "Code Issue"
                 section_content = section
                 
-                tags = self._extract_tags(section_title, section_content, file_path)
-                
+                tags = self._extract_tags(section_title, section_content, ctx)
+
                 issue = self._format_as_github_issue(
-                    file_path=file_path,
-                    issue_title=f"{section_title}: {Path(file_path).name}",
+                    file_path=ctx.path,
+                    issue_title=f"{section_title}: {Path(ctx.path).name}",
                     issue_body=section_content,
                     priority=priority,
                     analysis_type=types_str
@@ -393,98 +584,255 @@ This code will fail to compile/run.
         
         return issues
     
-    def analyze_file(self, file_path: str, content: str, analysis_types: List[str], user_prompt: Optional[str] = None) -> Dict[str, Any]:
-        """Analyze a single file and return GitHub issue-formatted results."""
-        issues = []
-        
+    def _check_syntax_result(self, ctx: _FileCtx, content: str, analysis_types: List[str], content_bytes: Optional[bytes] = None) -> Optional[Dict[str, Any]]:
+        """Run the local syntax check and wrap any error as a full result dict."""
         if "bugs" in analysis_types or "linting" in analysis_types or "build" in analysis_types:
-            syntax_error = self._check_syntax_errors(file_path, content)
+            syntax_error = self._check_syntax_errors(ctx, content, content_bytes)
             if syntax_error:
-                issues.append(syntax_error)
                 return {
-                    "file": file_path,
+                    "file": ctx.path,
                     "status": "success",
-                    "issues": issues,
+                    "issues": [syntax_error],
                     "powered_by": "Oumi Inference Engine",
                     "model": self.model_name
                 }
-        
+        return None
+
+    def _build_conversation(self, ctx: _FileCtx, content: str, analysis_types: List[str], user_prompt: Optional[str] = None) -> "Conversation":
+        """Build the analysis prompt for a file as a Conversation."""
         types_str = ", ".join(analysis_types) if isinstance(analysis_types, list) else analysis_types
         user_context = f"\n{user_prompt}\n" if user_prompt else ""
-        file_lang = self._get_file_language(file_path)
-        
-        prompt = f"""You are analyzing {file_lang} code for: {types_str}
 
-```{Path(file_path).suffix[1:] if Path(file_path).suffix else 'text'}
-{content[:80000]}
-```
+        # Only copy when the content actually exceeds the cap.
+        body = content if len(content) <= _MAX_PROMPT_CONTENT else content[:_MAX_PROMPT_CONTENT]
+        prompt = _PROMPT_TEMPLATE.format(
+            lang=ctx.lang,
+            types=types_str,
+            ext=ctx.suffix[1:] if ctx.suffix else 'text',
+            body=body,
+            user_context=user_context
+        )
 
-CHECK EVERY LINE for these issues:
-- Syntax errors: missing ), }}, ], ;, quotes, typos (strin→string)  
-- Division by zero: X/0
-- SQL injection: "SELECT" + user_input
-- Null access: value.property without null check
-- Security: eval(), os.system(), hardcoded secrets
-- Logic: if (x = 5) instead of ==, count && <Component/> shows 0
+        return Conversation(
+            messages=[Message(role=Role.USER, content=prompt)]
+        )
 
-Report ALL problems found:
-### Issues
-- Line X: [problem description]
+    def _extract_response_text(self, updated_conversation) -> str:
+        """Pull the assistant's reply text out of an inferred Conversation."""
+        if hasattr(updated_conversation, 'messages') and len(updated_conversation.messages) > 0:
+            last_message = updated_conversation.messages[-1]
+            if hasattr(last_message, 'content'):
+                return last_message.content
+            return str(last_message)
+        return str(updated_conversation)
 
-If NO problems: "No issues detected."{user_context}"""
+    def _build_result(self, ctx: _FileCtx, analysis_text: str, analysis_types: List[str]) -> Dict[str, Any]:
+        """Parse an analysis response into the per-file result payload."""
+        issues = self._parse_analysis_to_issues(ctx, analysis_text, analysis_types)
+        return {
+            "file": ctx.path,
+            "status": "success",
+            "issues": issues,
+            "powered_by": "Oumi Inference Engine",
+            "model": self.model_name
+        }
+
+    def _error_result(self, file_path: str, error: Exception) -> Dict[str, Any]:
+        return {
+            "file": file_path,
+            "status": "error",
+            "issues": [],
+            "error": str(error),
+            "powered_by": "Oumi Inference Engine"
+        }
+
+    def analyze_file(self, file_path: str, content: str, analysis_types: List[str], user_prompt: Optional[str] = None, content_bytes: Optional[bytes] = None) -> Dict[str, Any]:
+        """Analyze a single file and return GitHub issue-formatted results."""
+        ctx = _make_file_ctx(file_path)
+        if content_bytes is None:
+            # JSON can deliver lone surrogates; a bad file fails alone
+            # rather than taking the whole batch down.
+            try:
+                content_bytes = content.encode('utf-8')
+            except UnicodeEncodeError as e:
+                return self._error_result(file_path, e)
+        syntax_result = self._check_syntax_result(ctx, content, analysis_types, content_bytes)
+        if syntax_result:
+            return syntax_result
+
+        return self._analyze_remote(ctx, content, analysis_types, user_prompt, content_bytes)
 
+    def _analyze_remote(self, ctx: _FileCtx, content: str, analysis_types: List[str], user_prompt: Optional[str] = None, content_bytes: Optional[bytes] = None) -> Dict[str, Any]:
+        """Run the LLM analysis for a file that passed local syntax checks."""
+        if content_bytes is None:
+            try:
+                content_bytes = content.encode('utf-8')
+            except UnicodeEncodeError as e:
+                return self._error_result(ctx.path, e)
+        key = _analysis_cache_key(content_bytes, analysis_types, user_prompt)
         try:
-            conversation = Conversation(
-                messages=[Message(role=Role.USER, content=prompt)]
-            )
-            
-            response_list = self.engine.infer([conversation])
-            
-            if response_list and len(response_list) > 0:
-                updated_conversation = response_list[0]
-                if hasattr(updated_conversation, 'messages') and len(updated_conversation.messages) > 0:
-                    last_message = updated_conversation.messages[-1]
-                    if hasattr(last_message, 'content'):
-                        analysis_text = last_message.content
-                    else:
-                        analysis_text = str(last_message)
-                else:
-                    analysis_text = str(updated_conversation)
-            else:
-                analysis_text = "No response from model"
-            
-            parsed_issues = self._parse_analysis_to_issues(file_path, analysis_text, analysis_types)
-            issues.extend(parsed_issues)
-            
-            return {
-                "file": file_path,
-                "status": "success",
-                "issues": issues,
-                "powered_by": "Oumi Inference Engine",
-                "model": self.model_name
-            }
-            
+            analysis_text = self._fetch_analysis_text(ctx, content, analysis_types, user_prompt, key)
+            return self._build_result(ctx, analysis_text, analysis_types)
         except Exception as e:
-            return {
-                "file": file_path,
-                "status": "error",
-                "issues": [],
-                "error": str(e),
-                "powered_by": "Oumi Inference Engine"
-            }
-    
-    def analyze_files(self, files: List[Dict[str, str]], analysis_types: List[str], user_prompt: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Analyze multiple files."""
-        results = []
-        
-        for file_data in files:
-            result = self.analyze_file(
-                file_path=file_data["path"],
-                content=file_data["content"],
-                analysis_types=analysis_types,
-                user_prompt=user_prompt
-            )
-            results.append(result)
-        
+            return self._error_result(ctx.path, e)
+
+    def _fetch_analysis_text(self, ctx: _FileCtx, content: str, analysis_types: List[str], user_prompt: Optional[str], key: tuple) -> str:
+        """Return the analysis text for a content blob, via cache or one infer()."""
+        cached = _analysis_cache_get(key)
+        if cached is not None:
+            return cached
+
+        conversation = self._build_conversation(ctx, content, analysis_types, user_prompt)
+        response_list = self.engine.infer([conversation])
+
+        if response_list and len(response_list) > 0:
+            analysis_text = self._extract_response_text(response_list[0])
+            _analysis_cache_put(key, analysis_text)
+        else:
+            analysis_text = "No response from model"
+
+        return analysis_text
+
+    def analyze_files(self, files: Sequence[Any], analysis_types: List[str], user_prompt: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Analyze multiple files, batching all LLM calls into one infer().
+
+        `files` may hold dicts with path/content keys or objects with
+        path/content attributes (e.g. the API's Pydantic models).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+        if not files:
+            return results
+        pending = []
+
+        def prepare(indexed):
+            idx, file_data = indexed
+            file_path, content = _file_fields(file_data)
+            ctx = _make_file_ctx(file_path)
+            try:
+                content_bytes = content.encode('utf-8')
+            except UnicodeEncodeError as e:
+                return idx, ctx, self._error_result(ctx.path, e), None, None
+            syntax_result = self._check_syntax_result(ctx, content, analysis_types, content_bytes)
+            if syntax_result:
+                return idx, ctx, syntax_result, None, None
+            key = _analysis_cache_key(content_bytes, analysis_types, user_prompt)
+            cached = _analysis_cache_get(key)
+            if cached is not None:
+                return idx, ctx, self._build_result(ctx, cached, analysis_types), None, None
+            conversation = self._build_conversation(ctx, content, analysis_types, user_prompt)
+            return idx, ctx, None, conversation, key
+
+        # Fan the preparation phase out across the shared CPU pool; only
+        # files that pass (and miss the analysis cache) go to the
+        # inference engine.
+        prepared = list(_CPU_POOL.map(prepare, enumerate(files)))
+
+        for idx, ctx, result, conversation, key in prepared:
+            if result:
+                results[idx] = result
+            else:
+                pending.append((idx, ctx, conversation, key))
+
+        if pending:
+            # Real PRs often repeat identical content (vendored files,
+            # generated config, license headers). Infer once per unique
+            # content hash and fan the analysis out to every path sharing
+            # it; only the cheap per-path parse is repeated.
+            unique: OrderedDict = OrderedDict()
+            for entry in pending:
+                unique.setdefault(entry[3], []).append(entry)
+
+            conversations = [entries[0][2] for entries in unique.values()]
+            try:
+                response_list = self.engine.infer(conversations)
+            except Exception as e:
+                for idx, ctx, _, _ in pending:
+                    results[idx] = self._error_result(ctx.path, e)
+                return results
+
+            for (key, entries), response in zip(unique.items(), response_list):
+                try:
+                    analysis_text = self._extract_response_text(response)
+                    _analysis_cache_put(key, analysis_text)
+                except Exception as e:
+                    for idx, ctx, _, _ in entries:
+                        results[idx] = self._error_result(ctx.path, e)
+                    continue
+                for idx, ctx, _, _ in entries:
+                    results[idx] = self._build_result(ctx, analysis_text, analysis_types)
+
+            for idx, ctx, _, _ in pending:
+                if results[idx] is None:
+                    results[idx] = self._build_result(ctx, "No response from model", analysis_types)
+
         return results
 
+    async def analyze_files_async(self, files: Sequence[Any], analysis_types: List[str], user_prompt: Optional[str] = None, executor=None, cpu_executor=None, max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Analyze multiple files concurrently, overlapping the network-bound LLM calls.
+
+        `executor` runs the network-bound LLM calls and `cpu_executor`
+        (defaulting to the same pool) runs the local syntax checks, so a
+        burst of parsing never occupies threads meant for I/O waiting. A
+        semaphore bounds how many LLM calls are in flight at once.
+        """
+        loop = asyncio.get_event_loop()
+        sem = asyncio.Semaphore(max_concurrency)
+        if cpu_executor is None:
+            cpu_executor = executor
+        # Single-flight per content hash within this request: duplicate
+        # files would otherwise all miss the analysis cache concurrently
+        # and each fire their own LLM call. The first task for a key runs
+        # the inference; the rest await its future and parse the shared
+        # text against their own path.
+        inflight: Dict[tuple, asyncio.Future] = {}
+
+        async def analyze_one(file_data):
+            file_path, content = _file_fields(file_data)
+            ctx = _make_file_ctx(file_path)
+            try:
+                content_bytes = content.encode('utf-8')
+            except UnicodeEncodeError as e:
+                return self._error_result(ctx.path, e)
+
+            syntax_result = await loop.run_in_executor(
+                cpu_executor,
+                self._check_syntax_result,
+                ctx,
+                content,
+                analysis_types,
+                content_bytes
+            )
+            if syntax_result:
+                return syntax_result
+
+            key = _analysis_cache_key(content_bytes, analysis_types, user_prompt)
+            fut = inflight.get(key)
+            if fut is None:
+                fut = loop.create_future()
+                inflight[key] = fut
+                try:
+                    async with sem:
+                        analysis_text = await loop.run_in_executor(
+                            executor,
+                            self._fetch_analysis_text,
+                            ctx,
+                            content,
+                            analysis_types,
+                            user_prompt,
+                            key
+                        )
+                except Exception as e:
+                    # Stored as a value so waiters can fail per-path
+                    # without "exception never retrieved" noise.
+                    fut.set_result(e)
+                    return self._error_result(ctx.path, e)
+                fut.set_result(analysis_text)
+            else:
+                analysis_text = await fut
+                if isinstance(analysis_text, Exception):
+                    return self._error_result(ctx.path, analysis_text)
+
+            return self._build_result(ctx, analysis_text, analysis_types)
+
+        return list(await asyncio.gather(*[analyze_one(file_data) for file_data in files]))
+
@@ -8,6 +8,7 @@ import os
 import sys
 import logging
 import asyncio
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -37,7 +38,20 @@ logger.info(f"OPENAI_API_KEY present: {'✅ YES' if os.getenv('OPENAI_API_KEY')
 ANALYZER_AVAILABLE = False
 OumiAnalyzer = None
 analyzer_instance = None
-executor = ThreadPoolExecutor(max_workers=4)
+_analyzer_lock = threading.Lock()
+# Separate pools matched to bound type: LLM calls spend their time waiting
+# on the network, syntax parsing is CPU work.
+io_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("OUMI_IO_WORKERS", "32")),
+    thread_name_prefix="io"
+)
+cpu_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix="cpu"
+)
+# Back-pressure for /api/analyze: excess requests queue at the asyncio
+# level instead of piling work onto the executors.
+_ANALYZE_SEM = asyncio.Semaphore(int(os.getenv("OUMI_MAX_CONCURRENT", "8")))
 
 def import_analyzer():
     global ANALYZER_AVAILABLE, OumiAnalyzer
@@ -59,15 +73,19 @@ def import_analyzer():
 def get_analyzer():
     global analyzer_instance
     if analyzer_instance is None and ANALYZER_AVAILABLE:
-        try:
-            logger.info("Initializing OumiAnalyzer instance...")
-            analyzer_instance = OumiAnalyzer()
-            logger.info("✅ OumiAnalyzer instance created")
-        except Exception as e:
-            import traceback
-            logger.error(f"❌ Failed to create OumiAnalyzer instance: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            return None
+        # Double-checked so concurrent requests never build two analyzers
+        # (engine + tree-sitter init is the expensive part).
+        with _analyzer_lock:
+            if analyzer_instance is None:
+                try:
+                    logger.info("Initializing OumiAnalyzer instance...")
+                    analyzer_instance = OumiAnalyzer()
+                    logger.info("✅ OumiAnalyzer instance created")
+                except Exception as e:
+                    import traceback
+                    logger.error(f"❌ Failed to create OumiAnalyzer instance: {e}")
+                    logger.error(f"Traceback: {traceback.format_exc()}")
+                    return None
     return analyzer_instance
 
 import_analyzer()
@@ -128,20 +146,19 @@ async def analyze_code(request: AnalysisRequest):
                 status_code=503,
                 detail="OumiAnalyzer instance could not be created. Check server logs."
             )
-        files_data = [{"path": f.path, "content": f.content} for f in request.files]
         analysis_types = request.options.type if request.options and request.options.type else ["bugs"]
         if isinstance(analysis_types, str):
             analysis_types = [analysis_types]
         user_prompt = request.options.userPrompt if request.options and request.options.userPrompt else None
         
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(
-            executor,
-            analyzer.analyze_files,
-            files_data,
-            analysis_types,
-            user_prompt
-        )
+        async with _ANALYZE_SEM:
+            results = await analyzer.analyze_files_async(
+                request.files,
+                analysis_types,
+                user_prompt,
+                executor=io_executor,
+                cpu_executor=cpu_executor
+            )
         
         logger.info(f"Analysis complete: {sum(len(r.get('issues', [])) for r in results)} issues found")
         return {
@@ -165,7 +182,7 @@ async def startup_event():
     logger.info(f"🎉 Server starting on port {port}")
     logger.info(f"Health check: http://0.0.0.0:{port}/health")
     logger.info(f"API docs: http://0.0.0.0:{port}/docs")
-    logger.info(f"Concurrent requests: Enabled (max {executor._max_workers} workers)")
+    logger.info(f"Concurrent requests: Enabled ({io_executor._max_workers} IO / {cpu_executor._max_workers} CPU workers)")
     if not ANALYZER_AVAILABLE:
         logger.warning("⚠️  OumiAnalyzer not available - /api/analyze will fail")
         logger.warning("⚠️  Check OPENAI_API_KEY is set in environment variables")
@@ -176,8 +193,9 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info("Shutting down thread pool executor...")
-    executor.shutdown(wait=False)
+    logger.info("Shutting down thread pool executors...")
+    io_executor.shutdown(wait=False)
+    cpu_executor.shutdown(wait=False)
 
 if __name__ == "__main__":
     import uvicorn